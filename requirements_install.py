@@ -2,12 +2,24 @@ import os
 import subprocess
 import sys
 import importlib
-import tkinter as tk
-from tkinter import filedialog
+import argparse
+import shutil
+import threading
 import ast
 import re
+import random
 import time
-from functools import lru_cache
+import signal
+import hashlib
+import locale
+import pickle
+import json
+import mmap
+import types
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
 
 try:
     from importlib import metadata
@@ -19,6 +31,342 @@ except ImportError:
         sys.exit(1)
     from importlib import metadata
 
+# Konfigurationsdatei neben dem Skript (optional) und die Standardwerte aller Einstellungen
+CONFIG_PATH = os.path.splitext(os.path.abspath(__file__))[0] + ".ini"
+DEFAULT_CONFIG = {
+    "Verhalten": {
+        "wiederholungen": "3",
+        "verzoegerung": "5",
+        "pip_retries": "5",
+        "pip_upgrade_intervall": "24",
+    },
+    "Zeitlimits": {
+        "timeout_installation": "30",
+        "pip_socket_timeout": "15",
+    },
+    "Pfade": {
+        "cache_dir": "",
+        "wheel_dir": "",
+    },
+    "Pakete": {
+        "only_binary": "",
+    },
+}
+
+# Konfigurationsfehler werden nur im Hauptprozess gemeldet; die Analyseprozesse ("spawn")
+# importieren das Skript erneut und lesen dabei dieselbe Konfiguration ein
+_REPORT_CONFIG_ERRORS = multiprocessing.current_process().name == "MainProcess"
+
+# Funktion, um eine INI-Datei einzulesen; für das feste, kleine Schema genügt ein einfacher
+# Zeilenparser ohne die Interpolation und Verschachtelung von configparser
+def _parse_ini(path):
+    config = {}
+    section = None
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file.read().split("\n"):
+            line = line.strip()
+            if not line or line[0] in "#;":
+                continue
+            if line[0] == "[" and line[-1] == "]":
+                section = config.setdefault(line[1:-1].strip(), {})
+            elif section is not None:
+                key, separator, value = line.partition("=")
+                if separator:
+                    section[key.strip().lower()] = value.strip()
+    return config
+
+# Funktion, um die Konfiguration zu laden; fehlende Werte werden aus DEFAULT_CONFIG übernommen
+def load_config(path=CONFIG_PATH):
+    config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+    try:
+        for section, values in _parse_ini(path).items():
+            config.setdefault(section, {}).update(values)
+    except FileNotFoundError:
+        pass
+    except (OSError, UnicodeDecodeError) as e:
+        if _REPORT_CONFIG_ERRORS:
+            print(f"Konfigurationsdatei {path} konnte nicht gelesen werden, es werden die Standardwerte verwendet: {e}")
+    return config
+
+CONFIG = load_config()
+
+# Funktion, um einen Wert aus der Konfiguration zu lesen und in den gewünschten Typ umzuwandeln
+def get_config(section, key, cast=str):
+    value = CONFIG.get(section, {}).get(key, DEFAULT_CONFIG.get(section, {}).get(key))
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        default = DEFAULT_CONFIG[section][key]
+        if _REPORT_CONFIG_ERRORS:
+            print(f"Ungültiger Wert '{value}' für {key} in [{section}], es wird {default} verwendet.")
+        return cast(default)
+
+# Einmal eingelesene und umgewandelte Einstellungen; ungültige Werte werden so nur einmal gemeldet
+CFG = types.SimpleNamespace(
+    wiederholungen=get_config("Verhalten", "wiederholungen", int),
+    verzoegerung=get_config("Verhalten", "verzoegerung", int),
+    pip_retries=get_config("Verhalten", "pip_retries", int),
+    # Stunden, in denen nach einer Prüfung nicht erneut nach einer neuen pip-Version gesucht wird
+    pip_upgrade_intervall=get_config("Verhalten", "pip_upgrade_intervall", float),
+    timeout_installation=get_config("Zeitlimits", "timeout_installation", int),
+    pip_socket_timeout=get_config("Zeitlimits", "pip_socket_timeout", int),
+    cache_dir=get_config("Pfade", "cache_dir"),
+    wheel_dir=get_config("Pfade", "wheel_dir"),
+    # Pakete, die ausschließlich als fertige Wheels installiert werden (durch Kommas getrennt)
+    only_binary=tuple(name.strip() for name in get_config("Pakete", "only_binary").split(",") if name.strip()),
+)
+
+# Version des Cache-Formats, muss bei Änderungen an der Import-Extraktion erhöht werden
+CACHE_VERSION = 3
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "requirements_install")
+AST_CACHE_DIR = os.path.join(CACHE_DIR, "ast")
+
+# Importnamen, deren Paket auf PyPI anders heißt; die Schlüssel sind bereits kleingeschrieben,
+# damit beim Nachschlagen nur der Importname selbst normalisiert werden muss
+IMPORT_TO_PACKAGE_MAP = {name.lower(): package for name, package in {
+    "attr": "attrs",
+    "Bio": "biopython",
+    "bs4": "beautifulsoup4",
+    "Crypto": "pycryptodome",
+    "cv2": "opencv-python",
+    "dateutil": "python-dateutil",
+    "docx": "python-docx",
+    "dotenv": "python-dotenv",
+    "fitz": "PyMuPDF",
+    "gi": "PyGObject",
+    "git": "GitPython",
+    "jwt": "PyJWT",
+    "magic": "python-magic",
+    "mpl_toolkits": "matplotlib",
+    "MySQLdb": "mysqlclient",
+    "OpenSSL": "pyOpenSSL",
+    "osgeo": "GDAL",
+    "PIL": "Pillow",
+    "pkg_resources": "setuptools",
+    "pptx": "python-pptx",
+    "sass": "libsass",
+    "serial": "pyserial",
+    "skimage": "scikit-image",
+    "sklearn": "scikit-learn",
+    "slugify": "python-slugify",
+    "usb": "pyusb",
+    "win32api": "pywin32",
+    "win32con": "pywin32",
+    "wx": "wxPython",
+    "yaml": "PyYAML",
+    "zmq": "pyzmq",
+}.items()}
+
+# Unveränderliche Sicht auf die Zuordnung für das Nachschlagen
+_IMPORT_MAP = types.MappingProxyType(IMPORT_TO_PACKAGE_MAP)
+
+# Pakete, die beim Installieren einen C-Compiler benötigen
+COMPILER_PACKAGES = frozenset({"libsass", "some_other_package_requiring_compiler"})
+
+# C-Compiler, nach denen im Systempfad gesucht wird (unter Windows ergänzt shutil.which ".exe")
+COMPILER_NAMES = ("gcc", "clang", "cl")
+
+# Name am Anfang einer Anforderung wie "requests>=2.0" oder "flask[async]"
+_REQUIREMENT_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+# Kommentar in einer requirements-Datei (am Zeilenanfang oder nach Leerraum, wie bei pip)
+_REQUIREMENT_COMMENT_RE = re.compile(r"(?:^|\s+)#.*")
+
+# Verweis auf eine weitere requirements-Datei ("-r datei.txt" oder "--requirement=datei.txt")
+_REQUIREMENT_INCLUDE_RE = re.compile(r"(?:-r|--requirement)[\s=]*(\S+)")
+
+# Meldungen von pip ("ERROR: Could not ...", Build-Fehler), die die betroffenen Pakete nennen;
+# "unresolved" meldet pip auch, wenn der Index wegen eines Netzwerkfehlers nicht erreichbar war
+_PIP_REJECTED_RE = re.compile(
+    r"Failed to build installable wheels for some pyproject\.toml based projects \((?P<build_list>[^)]*)\)"
+    r"|(?:No matching distribution found for|Could not find a version that satisfies the requirement)[ \t]+(?P<unresolved>[^\r\n]+)"
+    r"|(?:Could not build wheels for|Failed building wheel for|Failed to build)[ \t]+(?P<build>[^\r\n]+)"
+)
+
+# Plattformabhängige Hinweise, einmal beim Start bestimmt
+PLATFORM_BUILD_HINT = {
+    "win32": "-> Unter Windows: Installieren Sie die \"Build Tools für Visual Studio\" (https://visualstudio.microsoft.com/visual-cpp-build-tools/).",
+    "linux": "-> Unter Debian/Ubuntu: sudo apt install build-essential python3-dev",
+    "darwin": "-> Unter macOS: xcode-select --install",
+}.get(sys.platform, "")
+PLATFORM_PG_HINT = {
+    "win32": "-> Unter Windows: Installieren Sie PostgreSQL und fügen Sie dessen bin-Verzeichnis dem PATH hinzu.",
+    "linux": "-> Unter Debian/Ubuntu: sudo apt install libpq-dev",
+    "darwin": "-> Unter macOS: brew install libpq",
+}.get(sys.platform, "")
+
+# Typische Fehlerursachen in der Fehlerausgabe von pip; die früheste Fundstelle entscheidet
+# Nur feste Formulierungen von pip und dem Betriebssystem, da die Ausgabe eines fehlgeschlagenen
+# Builds beliebigen Text enthält (z. B. "_mysql_ConnectionObject_Initialize" oder "-fpermissive");
+# Netzwerkfehler meldet pip vor allem über seine Wiederholungen ("Retrying (Retry(... after
+# connection broken by 'NewConnectionError(...)'") und über "Max retries exceeded"
+_PIP_DIAGNOSIS_RE = re.compile(
+    r"(?P<perm>permission denied|errno 13\b)"
+    r"|(?P<net>retrying \(retry\(|max retries exceeded|newconnectionerror|nameresolutionerror"
+    r"|network is unreachable|connection timed out|could not resolve host|failed to resolve"
+    r"|temporary failure in name resolution|proxy error|proxyerror|ssl:|tls )"
+    r"|(?P<pg>pg_config executable not found)"
+    r"|(?P<msvc>microsoft visual c\+\+ [\d.]+ or greater is required)"
+    r"|(?P<notfound>could not find a version that satisfies)"
+    r"|(?P<wheel>failed building wheel|failed to build|error: command .* failed with exit (?:status|code))",
+    re.IGNORECASE,
+)
+PIP_DIAGNOSIS_MESSAGES = {
+    "perm": "Berechtigungsproblem. Versuchen Sie, den Befehl mit Administratorrechten auszuführen.",
+    "net": "Netzwerkproblem erkannt. Überprüfen Sie Ihre Internetverbindung.",
+    "pg": "'pg_config' nicht gefunden. Bitte stellen Sie sicher, dass PostgreSQL installiert ist und dass 'pg_config' im Systempfad (PATH) enthalten ist.",
+    "msvc": "Microsoft Visual C++ Build Tools werden benötigt. Bitte installieren Sie die Build Tools für Visual Studio.",
+    "notfound": "Keine passende Version gefunden. Bitte überprüfen Sie den Paketnamen und die Versionsangabe.",
+    "wheel": "Das Paket konnte nicht gebaut werden. Möglicherweise fehlt ein Compiler oder eine Systembibliothek.",
+}
+PIP_DIAGNOSIS_HINTS = {
+    "pg": PLATFORM_PG_HINT,
+    "msvc": PLATFORM_BUILD_HINT,
+    "wheel": PLATFORM_BUILD_HINT,
+}
+
+# Fehlerursachen, bei denen ein erneuter Versuch helfen kann (None: nicht erkannte Ursache)
+# Bei "net" hat pip seine eigenen Wiederholungen (--retries) bereits ausgeschöpft; fehlende
+# Pakete, pg_config oder Build-Werkzeuge ändern sich durch Wiederholen nicht
+RETRYABLE_CAUSES = frozenset({"perm", "wheel", None})
+
+# Anzahl der letzten Ausgabezeilen von pip, die für Fehlermeldungen aufbewahrt werden
+PIP_OUTPUT_TAIL_LINES = 500
+
+# Sekunden, die nach einer Zeitüberschreitung höchstens auf die restliche Ausgabe von pip gewartet wird
+READER_JOIN_TIMEOUT = 0.5
+
+# Ab dieser Größe werden Quelldateien per mmap eingeblendet statt eingelesen
+MMAP_MIN_SIZE = 1024 * 1024
+
+# Ab dieser Anzahl ungecachter Dateien lohnt sich der Start eines Prozesspools
+PARALLEL_MIN_FILES = 8
+
+# Maximale Anzahl an Dateien, deren Einlesen gleichzeitig beim Kernel angestoßen ist (gleitendes Fenster)
+PREFETCH_MAX_FILES = 128
+
+# Funktion, um die Module der Standardbibliothek aus deren Verzeichnis zu ermitteln (für Python < 3.10)
+def _scan_stdlib_dir():
+    names = set()
+    stdlib_dir = os.path.dirname(os.__file__)
+    for directory in (stdlib_dir, os.path.join(stdlib_dir, "lib-dynload")):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if entry.name.isidentifier() and entry.name != "site-packages":
+                            names.add(entry.name)
+                    elif entry.name.endswith((".py", ".so", ".pyd")):
+                        names.add(entry.name.partition(".")[0])
+        except OSError:
+            continue
+    return frozenset(names)
+
+# Einmal ermittelte Module der Standardbibliothek, siehe get_stdlib_modules
+_stdlib_modules = None
+
+# Funktion, um die Namen der Module der Standardbibliothek zu erhalten, die nie über pip
+# installiert werden müssen; ab Python 3.10 liefert CPython dafür ein fertiges frozenset,
+# ältere Versionen durchsuchen das Verzeichnis der Standardbibliothek einmalig beim ersten Aufruf
+def get_stdlib_modules():
+    global _stdlib_modules
+    stdlib_modules = _stdlib_modules
+    if stdlib_modules is None:
+        stdlib_modules = getattr(sys, "stdlib_module_names", None)
+        if stdlib_modules is None:
+            stdlib_modules = frozenset(sys.builtin_module_names) | _scan_stdlib_dir()
+        _stdlib_modules = stdlib_modules
+    return stdlib_modules
+
+# Übersetzungstabelle für Paketnamen: Großbuchstaben klein, "_" und "." zu "-" in einem Durchlauf
+_NORMALIZE_TABLE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ_.", "abcdefghijklmnopqrstuvwxyz--")
+
+# Funktion, um einen Paketnamen nach PEP 503 zu normalisieren
+# Mehrere Trennzeichen hintereinander (selten) werden anschließend zu einem "-" zusammengefasst
+def _normalize_name(name):
+    name = name.translate(_NORMALIZE_TABLE)
+    if "--" in name:
+        name = re.sub(r"-{2,}", "-", name)
+    return name
+
+# Funktion, um den Pfad des Caches der installierten Pakete zu bestimmen
+# metadata.distributions() durchsucht alle Einträge von sys.path (auch Benutzer-site-packages,
+# PYTHONPATH und .pth-Einträge); der Schlüssel umfasst daher jeden Eintrag samt Änderungszeit,
+# bzw. dass er fehlt, und ändert sich, sobald dort etwas installiert oder entfernt wird
+# Der Dateiname beginnt mit einer Prüfsumme der Umgebung (sys.prefix und sys.path), damit
+# veraltete Dateien derselben Umgebung erkannt und gelöscht werden können
+def _installed_packages_cache_path():
+    environment = "|".join([sys.prefix, *sys.path])
+    key = ""
+    for entry in sys.path:
+        try:
+            key += f"|{entry}:{os.stat(entry or os.curdir).st_mtime_ns}"
+        except OSError:
+            key += f"|{entry}:-"
+    environment_digest = hashlib.blake2b(environment.encode(), digest_size=8).hexdigest()
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, f"pkgs-{environment_digest}-{digest}.json")
+
+# Einmal ermittelte installierte Pakete, siehe get_installed_packages
+_installed_packages = None
+
+# Funktion, um alle installierten Pakete mit ihrer Version zu erhalten (einmal pro Prozess ermittelt)
+def get_installed_packages():
+    global _installed_packages
+    packages = _installed_packages
+    if packages is None:
+        packages = _installed_packages = _compute_installed_packages()
+    return packages
+
+# Funktion, um alle installierten Pakete mit ihrer Version zu ermitteln
+def _compute_installed_packages():
+    cache_path = _installed_packages_cache_path()
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        pass
+
+    packages = {}
+    for dist in metadata.distributions():
+        # dist.metadata liest die METADATA-Datei bei jedem Zugriff neu ein
+        name = dist.metadata["Name"]
+        if name:
+            packages.setdefault(_normalize_name(name), dist.version)
+
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(packages, file)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    else:
+        _prune_installed_packages_caches(cache_path)
+    return packages
+
+# Funktion, um die veralteten Caches der installierten Pakete dieser Umgebung zu löschen
+# Der Schlüssel ändert sich mit jeder Installation, ältere Dateien werden danach nie mehr gelesen;
+# sie beginnen mit demselben Präfix wie die aktuelle Datei, Caches anderer Umgebungen bleiben erhalten
+def _prune_installed_packages_caches(cache_path):
+    current = os.path.basename(cache_path)
+    prefix = current.rpartition("-")[0] + "-"
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if name != current and name.startswith(prefix) and name.endswith(".json"):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+    except OSError:
+        pass
+
 # Cache für die Ergebnisse von importlib.util.find_spec
 @lru_cache(maxsize=None)
 def is_package_missing(package):
@@ -33,16 +381,18 @@ def ensure_required_packages(packages):
     
     if missing_packages:
         print("Fehlende Pakete werden installiert: ", ", ".join(missing_packages))
-        for package in missing_packages:
-            try:
-                install(package)
-            except subprocess.CalledProcessError as e:
-                print(f"Fehler bei der Installation von {package}: {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
-            except Exception as e:
-                print(f"Unerwarteter Fehler bei der Installation von {package}: {e}")
+        try:
+            install_packages(missing_packages)
+        except Exception as e:
+            print(f"Unerwarteter Fehler bei der Installation von {', '.join(missing_packages)}: {e}")
 
 # Funktion, um Dateien auszuwählen (Python-Skripte oder requirements.txt)
+# tkinter wird erst hier importiert, damit der Aufruf mit Pfaden (und jeder Analyseprozess)
+# auch ohne tkinter funktioniert
 def select_files():
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     try:
         root.withdraw()
@@ -59,124 +409,982 @@ def select_files():
         root.destroy()
     return file_paths
 
+# Funktion, um den Schlüssel und den Pfad des Cache-Eintrags einer Python-Datei zu bestimmen
+# Der Eintrag hängt nur von der Datei selbst ab; ob er noch aktuell ist, wird beim Laden geprüft
+def _ast_cache_key(file_path, deep=False):
+    key = (file_path, deep, CACHE_VERSION, tuple(sys.version_info))
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return key, os.path.join(AST_CACHE_DIR, f"{digest}.pkl")
+
+# Funktion, um die Prüfsumme eines Quelltexts (bytes oder mmap) zu berechnen
+def _source_digest(source):
+    return hashlib.blake2b(source, digest_size=16).digest()
+
+# Funktion, um die Prüfsumme einer Datei zu berechnen, ohne sie vollständig in Python einzulesen
+def _file_digest(file_path):
+    with open(file_path, "rb") as file:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(file, lambda: hashlib.blake2b(digest_size=16)).digest()
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+        return digest.digest()
+
+# Funktion, um die Importe einer unveränderten Datei aus dem Cache zu laden
+# Stimmen Änderungszeit und Größe überein, wird die Datei gar nicht gelesen. Wurde sie nur
+# angefasst (gleiche Größe, andere Änderungszeit), entscheidet die Prüfsumme des Inhalts
+def _ast_cache_load(key, cache_path, file_path, mtime_ns, size):
+    try:
+        with open(cache_path, "rb") as file:
+            entry = pickle.load(file)
+    except Exception:
+        # Fehlende oder beschädigte Cache-Dateien werden einfach neu erzeugt
+        return None
+    if not isinstance(entry, dict) or entry.get("key") != key or entry.get("size") != size:
+        return None
+    if entry.get("mtime_ns") == mtime_ns:
+        return entry.get("imports")
+    try:
+        if _file_digest(file_path) != entry.get("digest"):
+            return None
+    except OSError:
+        return None
+    _ast_cache_store(key, cache_path, mtime_ns, size, entry["digest"], entry.get("imports"))
+    return entry.get("imports")
+
+# Funktion, um die Importe einer Datei im Cache zu speichern (atomar über os.replace)
+def _ast_cache_store(key, cache_path, mtime_ns, size, digest, imports):
+    entry = {"key": key, "mtime_ns": mtime_ns, "size": size, "digest": digest, "imports": imports}
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(AST_CACHE_DIR, exist_ok=True)
+        with open(temp_path, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # Ohne beschreibbares Cache-Verzeichnis wird einfach ohne Cache gearbeitet
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+# Funktion, um die obersten Paketnamen einer Import-Anweisung zu einer Menge hinzuzufügen
+def _add_import_names(imports, node):
+    if isinstance(node, ast.Import):
+        for alias in node.names:
+            imports.add(_top_level_name(alias.name))
+    # Relative Importe (from . import x) verweisen auf das eigene Projekt
+    elif node.module and node.level == 0:
+        imports.add(_top_level_name(node.module))
+
+# try-Blöcke (einschließlich try/except* ab Python 3.11), deren Importe zur Modulebene zählen
+_TRY_NODES = (ast.Try, ast.TryStar) if hasattr(ast, "TryStar") else (ast.Try,)
+
+# Funktion, um zu prüfen, ob ein if-Block nur für Typprüfer gedacht ist ("if TYPE_CHECKING:")
+def _is_type_checking_block(node):
+    test = node.test
+    if isinstance(test, ast.Attribute):
+        return test.attr == "TYPE_CHECKING"
+    return isinstance(test, ast.Name) and test.id == "TYPE_CHECKING"
+
+# Funktion, um die Import-Anweisungen auf Modulebene zu durchlaufen
+# Funktions- und Klassenrümpfe enthalten meist optionale Abhängigkeiten und werden übersprungen;
+# try-, if- und with-Blöcke dagegen durchsucht, da sie Importe mit Ausweichlösung oder für
+# bestimmte Plattformen enthalten (außer "if TYPE_CHECKING:", das zur Laufzeit nie ausgeführt wird)
+def _iter_top_level_imports(body):
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif isinstance(node, _TRY_NODES):
+            yield from _iter_top_level_imports(node.body)
+            yield from _iter_top_level_imports(node.orelse)
+            yield from _iter_top_level_imports(node.finalbody)
+            for handler in node.handlers:
+                yield from _iter_top_level_imports(handler.body)
+        elif isinstance(node, ast.If):
+            if not _is_type_checking_block(node):
+                yield from _iter_top_level_imports(node.body)
+            yield from _iter_top_level_imports(node.orelse)
+        elif isinstance(node, ast.With):
+            yield from _iter_top_level_imports(node.body)
+
+# Felder, in denen Anweisungen (und damit Importe) verschachtelt sein können; Ausdrücke können
+# keine Import-Anweisung enthalten und werden bei der vollständigen Suche nicht besucht
+_STATEMENT_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+# Funktion, um alle Import-Anweisungen einschließlich der in Funktionen und Klassen zu durchlaufen
+def _iter_all_imports(body):
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue
+        for field in _STATEMENT_FIELDS:
+            children = getattr(node, field, None)
+            if children:
+                yield from _iter_all_imports(children)
+
+# Funktion, um den obersten Teil eines gepunkteten Modulnamens zu erhalten ("a.b.c" -> "a")
+# Ohne Punkt wird der Name unverändert zurückgegeben, ohne neues Objekt anzulegen
+def _top_level_name(name):
+    index = name.find('.')
+    return name if index == -1 else name[:index]
+
 # Funktion, um die Importe aus einer Python-Datei zu extrahieren
-def extract_imports(file_path):
+# Standardmäßig nur Importe auf Modulebene (einschließlich try/except); mit deep=True auch
+# Importe innerhalb von Funktionen, Klassen und Bedingungen
+def extract_imports(file_path, deep=False):
     try:
-        with open(file_path, "r") as file:
-            tree = ast.parse(file.read(), filename=file_path)
-    except FileNotFoundError:
-        print(f"Datei nicht gefunden: {file_path}")
-        return set()
-    except SyntaxError as e:
-        print(f"Syntaxfehler in der Datei {file_path}: {e}")
-        return set()
-    
+        stat = os.stat(file_path)
+    except OSError as e:
+        print(f"Datei {file_path} kann nicht gelesen werden und wird übersprungen: {e.strerror or e}")
+        return frozenset()
+    return _extract_imports_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, deep)
+
+# Cache innerhalb des Prozesses, zusätzlich zum Cache auf der Festplatte
+@lru_cache(maxsize=None)
+def _extract_imports_cached(file_path, mtime_ns, size, deep):
+    key, cache_path = _ast_cache_key(file_path, deep)
+    imports = _ast_cache_load(key, cache_path, file_path, mtime_ns, size)
+    if imports is not None:
+        return imports
+
+    # Nicht lesbare Dateien (z. B. fehlende Rechte) werden übersprungen, statt den Lauf abzubrechen
+    try:
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except OSError as e:
+        print(f"Datei {file_path} kann nicht gelesen werden und wird übersprungen: {e.strerror or e}")
+        return frozenset()
+    try:
+        file_size = os.fstat(fd).st_size
+        if file_size >= MMAP_MIN_SIZE:
+            # Große Dateien werden eingeblendet statt in ein bytes-Objekt kopiert
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as source:
+                imports = _imports_from_source(source, file_path, deep)
+                digest = _source_digest(source)
+        else:
+            source = os.read(fd, file_size)
+            imports = _imports_from_source(source, file_path, deep)
+            digest = _source_digest(source)
+    except OSError as e:
+        print(f"Datei {file_path} kann nicht gelesen werden und wird übersprungen: {e.strerror or e}")
+        return frozenset()
+    finally:
+        os.close(fd)
+
+    if imports is None:
+        return frozenset()
+    _ast_cache_store(key, cache_path, mtime_ns, size, digest, imports)
+    return imports
+
+# Muster für den schnellen Weg ohne ast.parse: ein Modul-Docstring am Dateianfang, jede Zeile, in
+# der "import" vorkommt, und die einfachen Formen "import a.b as c, d" und "from a import b, c"
+_LEADING_DOCSTRING_RE = re.compile(rb"\A(?:[ \t]*(?:#[^\n]*)?\r?\n)*[ \t]*[rRuU]?(\"\"\"|''').*?\1", re.DOTALL)
+_IMPORT_LINE_RE = re.compile(rb"^[^\n]*import[^\n]*", re.MULTILINE)
+_SIMPLE_IMPORT_RE = re.compile(
+    rb"[ \t]*(?:"
+    rb"import[ \t]+([\w.]+(?:[ \t]+as[ \t]+\w+)?(?:[ \t]*,[ \t]*[\w.]+(?:[ \t]+as[ \t]+\w+)?)*)"
+    rb"|from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]+(?:\*|\w+(?:[ \t]+as[ \t]+\w+)?(?:[ \t]*,[ \t]*\w+(?:[ \t]+as[ \t]+\w+)?)*)"
+    rb")[ \t]*(?:#[^\n]*)?\r?"
+)
+_COMMENT_LINE_RE = re.compile(rb"[ \t]*#")
+
+# Funktion, um die Importe ohne ast.parse direkt aus dem Quelltext zu lesen
+# Das ist nur sicher, solange keine Zeile mit "import" in einer mehrzeiligen Zeichenkette oder
+# Fortsetzungszeile stehen kann: Außer einem Modul-Docstring darf der Dateikopf daher keine
+# dreifachen Anführungszeichen und keine Zeilenfortsetzung mit "\" enthalten, und jede Zeile mit
+# "import" muss eine einfache Import-Anweisung oder ein Kommentar sein (ohne deep zudem nicht
+# eingerückt, da eingerückte Importe in Funktionen stehen könnten); sonst wird None zurückgegeben
+def _simple_imports(source, end, deep):
+    docstring = _LEADING_DOCSTRING_RE.match(source)
+    start = docstring.end() if docstring else 0
+    header = source[start:end]
+    if b'"""' in header or b"'''" in header or b"\\\n" in header or b"\\\r\n" in header:
+        return None
     imports = set()
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                imports.add(alias.name.split('.')[0])
-        elif isinstance(node, ast.ImportFrom):
-            if node.module:
-                imports.add(node.module.split('.')[0])
-    
+    for line in _IMPORT_LINE_RE.findall(header):
+        if _COMMENT_LINE_RE.match(line):
+            continue
+        if not deep and line[:1] in (b" ", b"\t"):
+            return None
+        match = _SIMPLE_IMPORT_RE.fullmatch(line)
+        if match is None:
+            return None
+        names, module = match.groups()
+        if names is not None:
+            for alias in names.split(b","):
+                imports.add(_top_level_name(alias.split()[0].decode("ascii")))
+        elif module and module[:1] != b".":
+            imports.add(_top_level_name(module.decode("ascii")))
     return imports
 
+# Funktion, um die Importe aus dem Quelltext (bytes oder mmap) zu ermitteln
+# ast.parse arbeitet direkt auf den Bytes und beachtet dabei die Kodierungsangabe nach PEP 263
+def _imports_from_source(source, file_path, deep):
+    # Ohne das Schlüsselwort "import" kann die Datei keine Importe enthalten
+    last_import = source.rfind(b"import")
+    if last_import == -1:
+        return frozenset()
+
+    # Hinter der Zeile mit dem letzten "import" kann keine Import-Anweisung mehr beginnen; meist
+    # genügt es daher, nur den Dateikopf zu betrachten
+    end = source.find(b"\n", last_import)
+    imports = _simple_imports(source, len(source) if end == -1 else end, deep)
+    if imports is not None:
+        return frozenset(imports)
+
+    # Endet der Ausschnitt mitten in einer Anweisung oder Zeichenkette, ist er ungültig und es
+    # wird die ganze Datei geparst
+    tree = None
+    if end != -1 and end + 1 < len(source):
+        try:
+            tree = ast.parse(source[:end + 1], filename=file_path)
+        except SyntaxError:
+            pass
+    if tree is None:
+        try:
+            tree = ast.parse(source, filename=file_path)
+        except SyntaxError as e:
+            print(f"Syntaxfehler in der Datei {file_path}: {e}")
+            return None
+    
+    imports = set()
+    nodes = _iter_all_imports(tree.body) if deep else _iter_top_level_imports(tree.body)
+    for node in nodes:
+        _add_import_names(imports, node)
+    return frozenset(imports)
+
+# Funktion, um das Einlesen mehrerer Dateien vorab beim Kernel anzustoßen (nur wo posix_fadvise verfügbar ist)
+def _prefetch_files(file_paths):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+# Funktion, um die Ergebnisse zu den Dateien der Reihe nach zu durchlaufen, während der Kernel die
+# folgenden Dateien bereits von der Festplatte liest, wie bei einem gleitenden Fenster: es sind
+# höchstens PREFETCH_MAX_FILES Dateien angestoßen, aber noch nicht verarbeitet
+def _iter_prefetched(file_paths, results):
+    _prefetch_files(file_paths[:PREFETCH_MAX_FILES])
+    for index, (file_path, result) in enumerate(zip(file_paths, results)):
+        _prefetch_files(file_paths[index + PREFETCH_MAX_FILES:index + PREFETCH_MAX_FILES + 1])
+        yield file_path, result
+
+# Funktion, um die Importe mehrerer Python-Dateien zu extrahieren, bei Bedarf parallel
+def extract_imports_batch(file_paths, deep=False):
+    results = {}
+    pending = []
+    for file_path in file_paths:
+        # Cache-Treffer werden direkt im Hauptprozess beantwortet
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            print(f"Datei {file_path} kann nicht gelesen werden und wird übersprungen: {e.strerror or e}")
+            results[file_path] = frozenset()
+            continue
+        absolute_path = os.path.abspath(file_path)
+        key, cache_path = _ast_cache_key(absolute_path, deep)
+        imports = _ast_cache_load(key, cache_path, absolute_path, stat.st_mtime_ns, stat.st_size)
+        if imports is None:
+            pending.append(file_path)
+        else:
+            results[file_path] = imports
+
+    # Der Kernel kann die Dateien so parallel von der Festplatte lesen, während geparst wird
+    extract = partial(extract_imports, deep=deep)
+    if len(pending) < PARALLEL_MIN_FILES:
+        for file_path, imports in _iter_prefetched(pending, map(extract, pending)):
+            results[file_path] = imports
+        return results
+
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(pending) // (workers * 4))
+    try:
+        # "spawn" verhält sich auf allen Plattformen gleich, auch unter Windows
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for file_path, imports in _iter_prefetched(pending, executor.map(extract, pending, chunksize=chunksize)):
+                results[file_path] = imports
+    except Exception as e:
+        print(f"Parallele Analyse fehlgeschlagen, Dateien werden nacheinander analysiert: {e}")
+        for file_path in pending:
+            if file_path not in results:
+                results[file_path] = extract_imports(file_path, deep)
+    return results
+
+# Funktion, um mit "\" fortgesetzte Zeilen einer requirements-Datei wie pip zusammenzufügen
+def _join_continuations(lines):
+    parts = []
+    for line in lines:
+        stripped = line.rstrip()
+        if stripped.endswith("\\"):
+            parts.append(stripped[:-1])
+            continue
+        parts.append(line)
+        yield " ".join(parts)
+        parts = []
+    if parts:
+        yield " ".join(parts)
+
+# Funktion, um eine Zeile wie pip in die Anforderung und die Optionen dahinter zu trennen
+# (z. B. "numpy==1.0 --hash=sha256:..."): die Optionen beginnen beim ersten Wort mit "-"
+def _split_requirement_options(line):
+    words = line.split()
+    for index, word in enumerate(words):
+        if word[0] == "-":
+            return " ".join(words[:index]), words[index:]
+    return line, []
+
 # Funktion, um Pakete aus einer requirements.txt-Datei zu extrahieren
-def extract_requirements(file_path):
-    with open(file_path, "r") as file:
-        packages = [line.strip() for line in file if line.strip() and not line.startswith("#")]
+# Verweise mit "-r" werden relativ zur Datei aufgelöst und jede Datei nur einmal gelesen;
+# andere pip-Optionen (z. B. "--index-url") werden übersprungen, ebenso Optionen einzelner
+# Anforderungen: Hashes (--hash) lassen sich für Anforderungen auf der Befehlszeile nicht angeben
+def extract_requirements(file_path, _seen=None):
+    seen = set() if _seen is None else _seen
+    file_path = os.path.abspath(file_path)
+    if file_path in seen:
+        return []
+    seen.add(file_path)
+    with open(file_path, "rb") as file:
+        lines = file.read().decode("utf-8", errors="replace").split("\n")
+    packages = []
+    skipped_hashes = False
+    for line in _join_continuations(lines):
+        line = _REQUIREMENT_COMMENT_RE.sub("", line).strip()
+        if not line:
+            continue
+        if line[0] == "-":
+            include = _REQUIREMENT_INCLUDE_RE.fullmatch(line)
+            if include:
+                included = os.path.join(os.path.dirname(file_path), include.group(1))
+                try:
+                    packages.extend(extract_requirements(included, seen))
+                except OSError as e:
+                    print(f"Verweis in {file_path} kann nicht gelesen werden: {e}")
+            else:
+                print(f"Option in {file_path} wird übersprungen: {line}")
+            continue
+        requirement, options = _split_requirement_options(line)
+        for option in options:
+            if option.startswith("--hash"):
+                skipped_hashes = True
+            elif option[0] == "-":
+                print(f"Option in {file_path} wird übersprungen: {requirement} {option}")
+        packages.append(_normalize_requirement(requirement))
+    if skipped_hashes:
+        print(f"Hashes in {file_path} werden nicht geprüft, da die Pakete gemeinsam an pip übergeben werden.")
     return packages
 
+# Funktion, um eine Anforderung einheitlich zu schreiben, damit gleiche Anforderungen aus
+# mehreren Dateien (z. B. "requests >= 2.0" und "requests>=2.0") nur einmal an pip gehen
+# Vor der Umgebungsmarkierung (";") ist Leerraum bedeutungslos; nach einer URL verlangt pip ihn
+def _normalize_requirement(line):
+    requirement, separator, marker = line.partition(";")
+    requirement = "".join(requirement.split())
+    if not separator:
+        return requirement
+    separator = " ; " if "@" in requirement else "; "
+    return requirement + separator + " ".join(marker.split())
+
+# Dateien, die in Verzeichnissen berücksichtigt werden (ohne Kopie des Namens durch str.lower)
+# Von den .txt-Dateien werden nur requirements-Dateien übernommen, nicht etwa LICENSE.txt
+_SUPPORTED_NAME_RE = re.compile(r"\.py\Z|\Arequirements.*\.txt\Z", re.IGNORECASE).search
+
+# Verzeichnisse, die beim rekursiven Durchsuchen übersprungen werden (ebenso alle versteckten)
+# Virtuelle Umgebungen enthalten fremde Pakete, deren Importe nicht zum Projekt gehören
+SKIPPED_DIRS = frozenset({"__pycache__", "node_modules", "venv", "site-packages"})
+
+# Funktion, um unterstützte Dateien in einem Verzeichnis zu finden, ohne zusätzliche stat-Aufrufe
+def _iter_supported(root, recursive):
+    is_supported_name = _SUPPORTED_NAME_RE
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        if recursive and name[0] != "." and name not in SKIPPED_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and is_supported_name(entry.name):
+                        yield entry.path
+        except OSError as e:
+            print(f"Verzeichnis kann nicht gelesen werden: {e}")
+
+# Funktion, um die Namen der projekteigenen Module und Pakete zu ermitteln, die nicht von PyPI
+# installiert werden dürfen: der Name jeder Python-Datei außerhalb eines Pakets (sie ist neben den
+# Skripten im selben Verzeichnis importierbar) bzw. das oberste Paket, in dem die Datei liegt
+# Als Paket zählt nur ein Verzeichnis mit __init__.py, auch oberhalb der angegebenen Pfade;
+# gewöhnliche Ordner wie "examples/requests/" verdecken kein gleichnamiges Paket von PyPI
+def find_local_modules(file_paths):
+    names = set()
+    is_package = {}
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        directory = os.path.dirname(os.path.abspath(file_path))
+        while True:
+            package = is_package.get(directory)
+            if package is None:
+                package = is_package[directory] = os.path.isfile(os.path.join(directory, "__init__.py"))
+            if not package:
+                break
+            name = os.path.basename(directory)
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        if name.isidentifier() and name != "__init__":
+            names.add(name)
+    return names
+
+# Funktion, um die zu analysierenden Dateien zu einem Pfad zu finden (Datei oder Verzeichnis)
+def find_files_in_path(path, recursive=True):
+    if os.path.isdir(path):
+        yield from _iter_supported(path, recursive)
+    else:
+        yield path
+
+# Dateiendungen, die als einzelne Dateien angegeben werden können
+SUPPORTED_EXTENSIONS = frozenset({".py", ".txt"})
+
 # Helper-Funktion, um zu überprüfen, ob eine Datei eine unterstützte Erweiterung hat
+# Die Endung wird zuerst geprüft, damit nicht unterstützte Pfade keinen stat-Aufruf kosten;
+# jeder Pfad wird pro Lauf nur einmal geprüft
+@lru_cache(maxsize=1024)
 def is_supported_file(file_path):
-    return os.path.isfile(file_path) and os.path.splitext(file_path)[1].lower() in [".py", ".txt"]
+    return os.path.splitext(file_path)[1].lower() in SUPPORTED_EXTENSIONS and os.path.isfile(file_path)
+
+# Sperre, damit sich die Ausgaben paralleler Installationen nicht vermischen
+_print_lock = threading.Lock()
+
+# Funktion, um eine Meldung auszugeben, auch wenn mehrere Installationen gleichzeitig laufen
+def _print(*args, **kwargs):
+    with _print_lock:
+        print(*args, **kwargs, flush=True)
+
+# Funktion, um zu prüfen, ob eines der Programme im Systempfad (PATH) liegt
+# shutil.which durchsucht nur PATH, statt für jedes Programm einen Prozess zu starten; das Ergebnis
+# wird pro Lauf nur einmal ermittelt, da Programme während der Laufzeit nicht erscheinen oder verschwinden
+@lru_cache(maxsize=None)
+def _any_on_path(names):
+    return any(shutil.which(name) for name in names)
+
+# Funktion, um zu prüfen, ob ein C-Compiler im Systempfad (PATH) liegt
+def has_c_compiler():
+    return _any_on_path(COMPILER_NAMES)
+
+# Funktion, um ein konfiguriertes Verzeichnis anzulegen und als absoluten Pfad zu erhalten
+# Gibt None zurück, wenn kein Verzeichnis konfiguriert ist oder es nicht angelegt werden kann
+# (message nennt dann mit {path} das Verzeichnis); jedes Verzeichnis wird pro Lauf nur einmal angelegt
+@lru_cache(maxsize=None)
+def _ensure_dir(path, message):
+    if not path:
+        return None
+    path = os.path.abspath(os.path.expanduser(path))
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        _print(f"{message.format(path=path)}: {e}")
+        return None
+    return path
+
+# Funktion, um das konfigurierte Cache-Verzeichnis von pip zu erhalten (None: Standard von pip)
+# Ein fester Ort sorgt dafür, dass heruntergeladene und gebaute Wheels zwischen Läufen,
+# z. B. in CI oder Containern mit eingebundenem Cache, wiederverwendet werden
+def _pip_cache_dir():
+    return _ensure_dir(CFG.cache_dir, "Cache-Verzeichnis {path} kann nicht angelegt werden, es wird der Standard von pip verwendet")
+
+# Funktion, um einen pip-Aufruf einschließlich des konfigurierten Cache-Verzeichnisses zusammenzusetzen
+# Jeder Aufruf verzichtet auf die Versionsprüfung von pip (eine zusätzliche Anfrage an PyPI bei
+# jedem Start) und auf Rückfragen; pip wird am Ende ohnehin gezielt aktualisiert
+def _pip_command(*args):
+    command = [sys.executable, "-m", "pip", "--disable-pip-version-check", "--no-input"]
+    cache_dir = _pip_cache_dir()
+    if cache_dir:
+        command += ["--cache-dir", cache_dir]
+    command.extend(args)
+    return command
+
+# Funktion, um das konfigurierte Verzeichnis für vorab heruntergeladene Pakete zu erhalten (oder None)
+def _wheel_dir():
+    return _ensure_dir(CFG.wheel_dir, "Verzeichnis {path} für heruntergeladene Pakete kann nicht angelegt werden, es wird direkt installiert")
+
+# Funktion, um einen "pip install"- oder "pip download"-Aufruf zusammenzusetzen; Netzwerkfehler
+# wiederholt pip selbst, ohne bereits Heruntergeladenes zu verwerfen und die Abhängigkeiten erneut aufzulösen
+# Für Pakete aus [Pakete] only_binary baut pip nie aus dem Quellcode und legt dafür
+# keine isolierte Build-Umgebung an; alle anderen Pakete werden im selben Aufruf normal installiert
+# Beim Herunterladen sorgt das dafür, dass für diese Pakete Wheels statt Quellpaketen im
+# wheel_dir landen, die die anschließende Installation ohne Netzwerk verwenden kann
+def _pip_install_command(*args, subcommand="install"):
+    command = _pip_command(
+        subcommand,
+        "--retries", str(CFG.pip_retries),
+        "--timeout", str(CFG.pip_socket_timeout),
+    )
+    if CFG.only_binary:
+        command += ["--only-binary", ",".join(CFG.only_binary)]
+    command.extend(args)
+    return command
+
+# Funktion, um das Zeitlimit für einen pip-Aufruf zu bestimmen (Sekunden pro Paket)
+# Es reicht mindestens für alle eigenen Wiederholungen von pip bei einer hängenden Verbindung
+# (pip_socket_timeout je Versuch), damit der Aufruf nicht vorher abgebrochen wird
+def _pip_timeout(timeout):
+    return max(timeout, CFG.pip_socket_timeout * (CFG.pip_retries + 1))
+
+# Funktion, um die Umgebung für pip-Aufrufe zu erhalten; PIP_CACHE_DIR gilt auch für
+# verschachtelte pip-Aufrufe, z. B. beim Bauen in einer isolierten Umgebung
+def _pip_env():
+    cache_dir = _pip_cache_dir()
+    return {**os.environ, "PIP_CACHE_DIR": cache_dir} if cache_dir else None
+
+# Funktion, um eine Ausgabezeile von pip unverändert als Bytes weiterzugeben
+# Ohne Konsole (pythonw, z. B. per Doppelklick gestartet) ist sys.stdout None; die Zeile wird
+# dann verworfen, damit der Leser weiterläuft und pip nicht an einer vollen Pipe hängen bleibt
+def _echo_bytes(line):
+    with _print_lock:
+        stdout = sys.stdout
+        if stdout is None:
+            return
+        buffer = getattr(stdout, "buffer", None)
+        if buffer is None:
+            stdout.write(line.decode(PIP_OUTPUT_ENCODING, errors="replace"))
+        else:
+            stdout.flush()
+            buffer.write(line)
+        stdout.flush()
+
+# Funktion, um einen Ausgabekanal von pip zeilenweise zu lesen und nur dessen Ende aufzubewahren
+def _drain_stream(stream, tail, echo):
+    with stream:
+        for line in stream:
+            tail.append(line)
+            if echo:
+                _echo_bytes(line)
+
+# Funktion, um pip auszuführen und die Ausgabe dabei fortlaufend zu verarbeiten
+# Statt die gesamte Ausgabe zu puffern (bei großen Builds viele MB), werden nur die letzten
+# PIP_OUTPUT_TAIL_LINES Zeilen für die Fehlerdiagnose behalten; mit echo wird stdout live ausgegeben,
+# ohne echo gar nicht erst gelesen, da die Diagnose nur stderr auswertet
+# Die Ausgabe wird als Bytes gelesen und nur im Fehlerfall (für Diagnose und Meldung) dekodiert
+# Verhält sich wie subprocess.run(..., check=True) und löst CalledProcessError bzw. TimeoutExpired aus
+def _run_pip(command, timeout=None, echo=True):
+    stdout_tail = deque(maxlen=PIP_OUTPUT_TAIL_LINES)
+    stderr_tail = deque(maxlen=PIP_OUTPUT_TAIL_LINES)
+    stdout_target = subprocess.PIPE if echo else subprocess.DEVNULL
+    process = subprocess.Popen(command, stdout=stdout_target, stderr=subprocess.PIPE, env=_pip_env())
+    readers = [threading.Thread(target=_drain_stream, args=(process.stderr, stderr_tail, False), daemon=True)]
+    if process.stdout is not None:
+        readers.append(threading.Thread(target=_drain_stream, args=(process.stdout, stdout_tail, echo), daemon=True))
+    for reader in readers:
+        reader.start()
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        # Hat ein von pip gestarteter Prozess die Pipes geerbt, bleiben sie nach dem Beenden offen;
+        # die Leser (Daemon-Threads) werden daher nur kurz abgewartet, wie bei subprocess.run
+        deadline = time.monotonic() + READER_JOIN_TIMEOUT
+        for reader in readers:
+            reader.join(max(0, deadline - time.monotonic()))
+        raise subprocess.TimeoutExpired(command, timeout, output=_decode_tail(stdout_tail), stderr=_decode_tail(stderr_tail))
+    for reader in readers:
+        reader.join()
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command, output=_decode_tail(stdout_tail), stderr=_decode_tail(stderr_tail))
+    return subprocess.CompletedProcess(command, returncode, b"".join(stdout_tail), b"".join(stderr_tail))
+
+# Kodierung der Ausgabe von pip, wie sie subprocess im Textmodus verwenden würde
+PIP_OUTPUT_ENCODING = locale.getpreferredencoding(False)
+
+# Funktion, um das aufbewahrte Ende einer Ausgabe von pip als Text zu erhalten
+def _decode_tail(tail):
+    return b"".join(tail).decode(PIP_OUTPUT_ENCODING, errors="replace")
+
+# Wird bei Strg+C gesetzt, damit Wartezeiten zwischen den Versuchen sofort enden
+SHUTDOWN_EVENT = threading.Event()
+
+# Signal-Handler für Strg+C während der Installation; ein zweites Strg+C bricht sofort ab
+def _request_shutdown(signum, frame):
+    SHUTDOWN_EVENT.set()
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+# Funktion, um vor einem erneuten Versuch zu warten (exponentieller Backoff mit Zufallsanteil)
+# Der Zufallsanteil verteilt die Wiederholungen mehrerer Pakete zeitlich, damit sie nicht alle
+# gleichzeitig erneut auf PyPI zugreifen; gibt True zurück, wenn abgebrochen wurde
+def _wait_before_retry(delay, attempt):
+    return SHUTDOWN_EVENT.wait(random.uniform(delay, delay * (2 ** attempt)))
 
-# Funktion, um ein Paket zu installieren, mit einem Retry-Mechanismus
-def install(package, retries=3, delay=5, timeout=30):
+# Funktion, um die Voraussetzungen für die Installation eines Pakets sicherzustellen
+def _prepare_install(package, timeout=30):
     # Sicherstellen, dass erforderliche Abhängigkeiten vorhanden sind
     if package == "libsass":
         try:
-            subprocess.run([sys.executable, "-m", "pip", "install", "setuptools"], check=True, timeout=timeout, capture_output=True, text=True)
+            _run_pip(_pip_command("install", "setuptools"), timeout=timeout, echo=False)
         except subprocess.CalledProcessError as e:
-            print(f"Fehler bei der Installation von setuptools: {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
-            return
+            _print(f"Fehler bei der Installation von setuptools: {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
+            return False
     
     # Überprüfen, ob systemweite Abhängigkeiten fehlen
-    if package in ["libsass", "some_other_package_requiring_compiler"]:
-        try:
-            result = subprocess.run(["gcc", "--version"], check=True, capture_output=True, text=True)
-        except FileNotFoundError:
-            print("GCC-Compiler nicht gefunden. Bitte installieren Sie einen C-Compiler, um die Installation von Paketen wie libsass zu ermöglichen.")
-            return
-        except subprocess.CalledProcessError as e:
-            print(f"Fehler beim Überprüfen des GCC-Compilers: {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
-            return
-    
+    if package in COMPILER_PACKAGES:
+        if not has_c_compiler():
+            _print("Kein C-Compiler (gcc, clang oder cl.exe) gefunden. Bitte installieren Sie einen C-Compiler, um die Installation von Paketen wie libsass zu ermöglichen.")
+            if PLATFORM_BUILD_HINT:
+                _print(PLATFORM_BUILD_HINT)
+            return False
+    return True
+
+# Funktion, um ein einzelnes, vorbereitetes Paket mit Retry-Mechanismus zu installieren
+def _install_single(package, retries=3, delay=5, timeout=30):
+    timeout = _pip_timeout(timeout)
+    attempts = 0
     for attempt in range(retries):
+        if SHUTDOWN_EVENT.is_set():
+            break
+        attempts += 1
         try:
-            result = subprocess.run([sys.executable, "-m", "pip", "install", package], check=True, timeout=timeout, capture_output=True, text=True)
-            print(result.stdout)
-            return
+            _run_pip(_pip_install_command(package), timeout=timeout)
+            return True
         except subprocess.CalledProcessError as e:
-            error_message = e.stderr.lower() if e.stderr else ""
-            if "permission" in error_message:
-                print(f"Fehler bei der Installation von {package} (Versuch {attempt + 1} von {retries}): Berechtigungsproblem. Versuchen Sie, den Befehl mit Administratorrechten auszuführen.")
-            elif "network" in error_message or "connection" in error_message:
-                print(f"Fehler bei der Installation von {package} (Versuch {attempt + 1} von {retries}): Netzwerkproblem erkannt. Überprüfen Sie Ihre Internetverbindung.")
-            elif "pg_config" in error_message:
-                print(f"Fehler bei der Installation von {package} (Versuch {attempt + 1} von {retries}): 'pg_config' nicht gefunden. Bitte stellen Sie sicher, dass PostgreSQL installiert ist und dass 'pg_config' im Systempfad (PATH) enthalten ist.")
-            else:
-                print(f"Fehler bei der Installation von {package} (Versuch {attempt + 1} von {retries}): {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
-            if attempt < retries - 1:
-                time.sleep(delay * (2 ** attempt))  # Exponentieller Backoff
+            if SHUTDOWN_EVENT.is_set():
+                # pip wurde durch Strg+C beendet
+                break
+            cause = _diagnose(e.stderr, _is_network_failure(e.stderr, [package]))
+            diagnosis = PIP_DIAGNOSIS_MESSAGES.get(cause)
+            if diagnosis is None:
+                diagnosis = f"{e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}"
+            _print(f"Fehler bei der Installation von {package} (Versuch {attempt + 1} von {retries}): {diagnosis}")
+            hint = PIP_DIAGNOSIS_HINTS.get(cause)
+            if hint:
+                _print(hint)
+            if cause not in RETRYABLE_CAUSES:
+                break
+            if attempt < retries - 1 and _wait_before_retry(delay, attempt):
+                break
         except subprocess.TimeoutExpired as e:
-            print(f"Zeitüberschreitung bei der Installation von {package} (Versuch {attempt + 1} von {retries}): {e}")
-            if attempt < retries - 1:
-                time.sleep(delay * (2 ** attempt))  # Exponentieller Backoff
+            _print(f"Zeitüberschreitung bei der Installation von {package} (Versuch {attempt + 1} von {retries}): {e}")
+            if attempt < retries - 1 and _wait_before_retry(delay, attempt):
+                break
         except Exception as e:
-            print(f"Unerwarteter Fehler bei der Installation von {package}: {e}")
+            _print(f"Unerwarteter Fehler bei der Installation von {package}: {e}")
+            break
+    if SHUTDOWN_EVENT.is_set():
+        _print(f"Installation von {package} abgebrochen.")
+    else:
+        _print(f"Installation von {package} nach {attempts} {'Versuch' if attempts == 1 else 'Versuchen'} fehlgeschlagen.")
+    return False
+
+# Funktion, um den Paketnamen einer Anforderung wie "requests>=2.0" zu erhalten
+def _requirement_name(requirement):
+    match = _REQUIREMENT_NAME_RE.match(requirement.strip())
+    return _normalize_name(match.group(0)) if match else _normalize_name(requirement)
+
+# Funktion, um die Fehlerausgabe von pip in einem einzigen Durchlauf einer Fehlerursache zuzuordnen
+# Gibt den Namen der Gruppe in _PIP_DIAGNOSIS_RE zurück oder None; mit network=False werden
+# Netzwerkmeldungen übergangen (z. B. wenn pip ein Paket als nicht baubar meldet)
+def _diagnose(stderr, network=True):
+    for match in _PIP_DIAGNOSIS_RE.finditer(stderr or ""):
+        if network or match.lastgroup != "net":
+            return match.lastgroup
+    return None
+
+# Funktion, um zu prüfen, ob ein pip-Aufruf an einem Netzwerkfehler gescheitert ist
+# Nennt pip eines der Pakete als nicht baubar, ist der Build die Ursache, auch wenn die Ausgabe
+# zusätzlich eine Netzwerkmeldung enthält; nicht auflösbare Pakete meldet pip dagegen auch,
+# wenn der Index nicht erreichbar war
+def _is_network_failure(stderr, packages):
+    return _diagnose(stderr) == "net" and not _rejected_packages(stderr, packages, build_only=True)
+
+# Funktion, um zu prüfen, ob eine Anforderung ohne Versionsangabe bereits erfüllt ist
+# Anforderungen mit Versionsangabe (z. B. "requests>=2.0") entscheidet weiterhin pip
+def _is_installed(requirement, installed_packages):
+    requirement = requirement.strip()
+    return _REQUIREMENT_NAME_RE.fullmatch(requirement) is not None and _normalize_name(requirement) in installed_packages
+
+# Funktion, um aus der Fehlerausgabe von pip die Pakete zu ermitteln, die nicht aufgelöst oder
+# gebaut werden konnten (mit build_only nur die, deren Build fehlgeschlagen ist)
+def _rejected_packages(stderr, packages, build_only=False):
+    rejected_names = set()
+    for match in _PIP_REJECTED_RE.finditer(stderr or ""):
+        if build_only and match.lastgroup == "unresolved":
+            continue
+        # Mehrere Pakete werden von pip durch Kommas getrennt aufgezählt
+        for name in match.group(match.lastindex).split(","):
+            if name.strip():
+                rejected_names.add(_requirement_name(name))
+    return [package for package in packages if _requirement_name(package) in rejected_names]
+
+# Funktion, um die normalisierten Namen der Pakete in einem Download-Verzeichnis zu ermitteln
+# Wheels heißen "<name>-<version>-...whl", Quellpakete "<name>-<version>.tar.gz" bzw. ".zip"
+def _downloaded_names(dest):
+    names = set()
+    with os.scandir(dest) as entries:
+        for entry in entries:
+            filename = entry.name
+            if filename.endswith(".whl"):
+                names.add(_normalize_name(filename.split("-", 1)[0]))
+            elif filename.endswith((".tar.gz", ".zip")):
+                names.add(_normalize_name(filename.rsplit("-", 1)[0]))
+    return names
+
+# Funktion, um Pakete samt Abhängigkeiten vorab in ein lokales Verzeichnis herunterzuladen
+# Pakete ohne Versionsangabe, die dort bereits liegen, werden nicht erneut aufgelöst
+# Gibt True zurück, wenn alle Pakete anschließend lokal vorliegen
+def download_wheels(packages, dest, timeout=30):
+    downloaded = _downloaded_names(dest)
+    packages = [package for package in packages if not _is_installed(package, downloaded)]
+    if not packages:
+        return True
+    _print(f"Lade Pakete nach {dest} herunter: {', '.join(packages)}")
+    try:
+        _run_pip(_pip_install_command("--dest", dest, *packages, subcommand="download"), timeout=_pip_timeout(timeout) * len(packages))
+        return True
+    except subprocess.CalledProcessError as e:
+        _print(f"Herunterladen fehlgeschlagen, Pakete werden direkt installiert: {e.cmd} mit Rückgabewert {e.returncode}")
+    except subprocess.TimeoutExpired as e:
+        _print(f"Zeitüberschreitung beim Herunterladen, Pakete werden direkt installiert: {e}")
+    return False
+
+# Funktion, um mehrere Pakete mit einem einzigen pip-Aufruf zu installieren
+# pip löst so alle Abhängigkeiten gemeinsam auf und startet nur einmal; nur Pakete, die dabei
+# scheitern, werden anschließend einzeln (mit eigener Fehlerdiagnose) installiert
+# Mit jobs > 1 werden diese Einzelinstallationen parallel ausgeführt
+# Gibt die Liste der Pakete zurück, deren Installation fehlgeschlagen ist
+def install_packages(packages, retries=3, delay=5, timeout=30, jobs=1):
+    # Bereits installierte Pakete ohne Versionsangabe brauchen keinen pip-Aufruf
+    installed_packages = get_installed_packages()
+    packages = [package for package in packages if not _is_installed(package, installed_packages)]
+    pending = [package for package in packages if _prepare_install(package, timeout)]
+    failed = [package for package in packages if package not in pending]
+    individual = []
+    # Mit konfiguriertem wheel_dir wird zuerst alles heruntergeladen und dann ohne Netzwerk installiert
+    wheel_dir = _wheel_dir()
+    if pending and wheel_dir and download_wheels(pending, wheel_dir, timeout):
+        source = ("--no-index", "--find-links", wheel_dir)
+    else:
+        source = ()
+    attempt = 0
+    while pending:
+        command = _pip_install_command(*source, *pending)
+        try:
+            _run_pip(command, timeout=_pip_timeout(timeout) * len(pending))
+            pending = []
             break
-    print(f"Installation von {package} nach {retries} Versuchen fehlgeschlagen.")
+        except subprocess.CalledProcessError as e:
+            if SHUTDOWN_EVENT.is_set():
+                # pip wurde durch Strg+C beendet
+                break
+            if _is_network_failure(e.stderr, pending):
+                # pip hat seine eigenen Wiederholungen bereits ausgeschöpft; pip meldet dabei auch
+                # "No matching distribution", die Pakete werden daher nicht aufgeteilt
+                _print("Fehler bei der gemeinsamen Installation: Netzwerkproblem erkannt. Überprüfen Sie Ihre Internetverbindung.")
+                failed.extend(pending)
+                pending = []
+                break
+            rejected = _rejected_packages(e.stderr, pending)
+            if rejected:
+                # Die übrigen Pakete werden sofort ohne die nicht auflösbaren erneut gemeinsam installiert
+                individual.extend(rejected)
+                pending = [package for package in pending if package not in rejected]
+                continue
+            _print(f"Gemeinsame Installation fehlgeschlagen, Pakete werden einzeln installiert: {e.cmd} mit Rückgabewert {e.returncode}")
+            break
+        except subprocess.TimeoutExpired as e:
+            _print(f"Zeitüberschreitung bei der gemeinsamen Installation (Versuch {attempt + 1} von {retries}): {e}")
+        attempt += 1
+        if attempt >= retries or _wait_before_retry(delay, attempt - 1):
+            break
+
+    remaining = individual + pending
+    if SHUTDOWN_EVENT.is_set():
+        _print(f"Installation abgebrochen: {', '.join(remaining)}")
+        return failed + remaining
+    if jobs > 1 and len(remaining) > 1:
+        # Die einzelnen pip-Aufrufe warten vor allem auf das Netzwerk und laufen daher in Threads
+        with ThreadPoolExecutor(max_workers=min(jobs, len(remaining))) as executor:
+            futures = {executor.submit(_install_single, package, retries, delay, timeout): package for package in remaining}
+            for future in as_completed(futures):
+                if not future.result():
+                    failed.append(futures[future])
+    else:
+        for package in remaining:
+            if not _install_single(package, retries, delay, timeout):
+                failed.append(package)
+    return failed
+
+# Funktion, um den Pfad der Zeitmarke der letzten pip-Prüfung für diese Umgebung zu bestimmen
+def _pip_upgrade_stamp_path():
+    digest = hashlib.blake2b(sys.prefix.encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, f"pip-upgrade-{digest}.stamp")
+
+# Funktion, um zu prüfen, ob pip innerhalb von [Verhalten] pip_upgrade_intervall bereits geprüft wurde
+def _pip_upgrade_checked_recently(stamp_path):
+    try:
+        return time.time() - os.stat(stamp_path).st_mtime < CFG.pip_upgrade_intervall * 3600
+    except OSError:
+        return False
+
+# Funktion, um die Zeitmarke der letzten pip-Prüfung zu setzen
+def _touch_pip_upgrade_stamp(stamp_path):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(stamp_path, "a"):
+            pass
+        os.utime(stamp_path)
+    except OSError:
+        pass
+
+# Funktion, um ohne Änderungen zu prüfen, ob eine neuere pip-Version verfügbar ist
+# Gibt True/False zurück oder None, wenn pip die Prüfung nicht unterstützt (vor pip 22.2);
+# scheitert der Probelauf aus einem anderen Grund (z. B. ohne Netzwerk), wird die
+# CalledProcessError bzw. TimeoutExpired weitergegeben
+# Ist der Index nicht erreichbar, behält pip die installierte Version und meldet trotzdem Erfolg;
+# Netzwerkmeldungen in der Fehlerausgabe gelten daher ebenfalls als gescheiterte Prüfung
+def _pip_upgrade_available(timeout=None):
+    report_path = f"{_pip_upgrade_stamp_path()}.{os.getpid()}.json"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        command = _pip_command("install", "--upgrade", "pip", "--dry-run", "--quiet", "--report", report_path)
+        result = _run_pip(command, timeout=timeout, echo=False)
+        stderr = _decode_tail([result.stderr])
+        if _diagnose(stderr) == "net":
+            raise subprocess.CalledProcessError(result.returncode, command, output=None, stderr=stderr)
+        with open(report_path, "r", encoding="utf-8") as file:
+            return bool(json.load(file).get("install"))
+    except subprocess.CalledProcessError as e:
+        if "no such option" in (e.stderr or ""):
+            return None
+        raise
+    except (OSError, ValueError):
+        return None
+    finally:
+        try:
+            os.remove(report_path)
+        except OSError:
+            pass
 
 # Funktion, um pip zu aktualisieren, falls eine neue Version verfügbar ist
+# Die Prüfung erfolgt höchstens einmal je pip_upgrade_intervall Stunden und zunächst als
+# Probelauf; nur wenn dieser eine neuere Version meldet, wird tatsächlich aktualisiert
 def upgrade_pip_if_needed():
+    stamp_path = _pip_upgrade_stamp_path()
+    if _pip_upgrade_checked_recently(stamp_path):
+        print("pip wurde vor Kurzem geprüft, die Aktualisierung wird übersprungen.")
+        return
+    timeout = _pip_timeout(CFG.timeout_installation)
+    try:
+        available = _pip_upgrade_available(timeout)
+    except subprocess.CalledProcessError as e:
+        diagnosis = PIP_DIAGNOSIS_MESSAGES.get(_diagnose(e.stderr), f"{e.cmd} mit Rückgabewert {e.returncode}")
+        print(f"Prüfung auf eine neue pip-Version fehlgeschlagen, die Aktualisierung wird übersprungen: {diagnosis}")
+        return
+    except subprocess.TimeoutExpired as e:
+        print(f"Zeitüberschreitung bei der Prüfung auf eine neue pip-Version, die Aktualisierung wird übersprungen: {e}")
+        return
+    if available is False:
+        print("pip ist bereits aktuell.")
+        _touch_pip_upgrade_stamp(stamp_path)
+        return
     try:
         print("Aktualisiere pip...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], check=True, capture_output=True, text=True)
+        _run_pip(_pip_command("install", "--upgrade", "pip"), timeout=timeout, echo=False)
         print("pip wurde erfolgreich aktualisiert.")
+        _touch_pip_upgrade_stamp(stamp_path)
     except subprocess.CalledProcessError as e:
         print(f"Fehler beim Aktualisieren von pip: {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
+    except subprocess.TimeoutExpired as e:
+        print(f"Zeitüberschreitung beim Aktualisieren von pip: {e}")
     except Exception as e:
         print(f"Unerwarteter Fehler beim Aktualisieren von pip: {e}")
 
 if __name__ == "__main__":
-    # Überprüfe, ob tkinter installiert ist, bevor das Skript ausgeführt wird
-    ensure_required_packages(["tkinter"])
+    parser = argparse.ArgumentParser(description="Installiert fehlende Bibliotheken aus Python-Skripten und requirements.txt-Dateien.")
+    parser.add_argument("paths", nargs="*", help="Dateien oder Verzeichnisse; ohne Angabe öffnet sich der Dateiauswahldialog")
+    parser.add_argument("--no-recursive", action="store_true", help="Unterverzeichnisse nicht durchsuchen")
+    parser.add_argument("--jobs", type=int, default=1, help="Anzahl paralleler Einzelinstallationen, falls die gemeinsame Installation fehlschlägt (Standard: 1)")
+    parser.add_argument("--retries", type=int, default=CFG.wiederholungen, help=f"Installationsversuche pro Paket (Standard: {CFG.wiederholungen})")
+    parser.add_argument("--delay", type=int, default=CFG.verzoegerung, help=f"Grundwartezeit in Sekunden zwischen den Versuchen (Standard: {CFG.verzoegerung})")
+    parser.add_argument("--timeout", type=int, default=CFG.timeout_installation, help=f"Zeitlimit in Sekunden pro Paket (Standard: {CFG.timeout_installation})")
+    parser.add_argument("--no-pip-upgrade", action="store_true", help="pip am Ende nicht aktualisieren")
+    parser.add_argument("--deep-import-scan", action="store_true", help="Auch Importe innerhalb von Funktionen und Klassen berücksichtigen")
+    args = parser.parse_args()
 
-    file_paths = select_files()
+    # Die installierten Pakete werden im Hintergrund ermittelt, während Dateien gesucht und analysiert werden
+    background = ThreadPoolExecutor(max_workers=1)
+    installed_future = background.submit(get_installed_packages)
+    background.shutdown(wait=False)
+
+    if args.paths:
+        file_paths = [file_path for path in args.paths for file_path in find_files_in_path(path, not args.no_recursive)]
+    else:
+        # Überprüfe, ob tkinter installiert ist, bevor der Dateiauswahldialog geöffnet wird
+        ensure_required_packages(["tkinter"])
+        file_paths = select_files()
     if file_paths:
-        all_libraries = set()
+        # dict statt set: jede Bibliothek nur einmal, aber in der Reihenfolge ihres Auftretens,
+        # damit Ausgabe und pip-Aufruf bei jedem Lauf gleich aussehen
+        all_libraries = {}
+        requirement_sources = {}
+        python_files = []
         for file_path in file_paths:
             if is_supported_file(file_path):
-                if file_path.endswith(".py"):
-                    all_libraries.update(extract_imports(file_path))
-                elif file_path.endswith(".txt"):
-                    all_libraries.update(extract_requirements(file_path))
+                # Wie in is_supported_file ohne Beachtung der Groß-/Kleinschreibung (z. B. "REQUIREMENTS.TXT")
+                extension = os.path.splitext(file_path)[1].lower()
+                if extension == ".py":
+                    python_files.append(file_path)
+                elif extension == ".txt":
+                    # Alle requirements-Dateien werden zusammengeführt und gemeinsam installiert
+                    for requirement in extract_requirements(file_path):
+                        all_libraries.setdefault(requirement)
+                        requirement_sources.setdefault(requirement, []).append(file_path)
             else:
                 print(f"Ungültiger oder nicht unterstützter Dateityp übersprungen: {file_path}")
 
+        # Module der Standardbibliothek und des eigenen Projekts werden nicht installiert
+        stdlib_modules = get_stdlib_modules()
+        local_modules = find_local_modules(python_files)
+        imports_by_file = extract_imports_batch(python_files, args.deep_import_scan)
+        # Innerhalb einer Datei sind die Importe ungeordnet und werden daher sortiert; jeder Name
+        # wird nur einmal geprüft und abgebildet, auch wenn ihn viele Dateien verwenden
+        import_names = dict.fromkeys(name for file_path in python_files for name in sorted(imports_by_file[file_path]))
+        # Importnamen auf den Paketnamen abbilden, z. B. cv2 -> opencv-python
+        all_libraries.update(dict.fromkeys(_IMPORT_MAP.get(name.lower(), name) for name in import_names if name not in stdlib_modules and name not in local_modules))
+
         # Installiere jede Bibliothek nur einmal
+        installed_packages = installed_future.result()
+        missing_libraries = []
         for lib in all_libraries:
-            try:
-                metadata.version(lib)
+            if _normalize_name(lib) in installed_packages:
                 print(f"{lib} ist bereits installiert.")
-            except metadata.PackageNotFoundError:
+            else:
                 print(f"{lib} wird installiert...")
-                try:
-                    install(lib)
-                except subprocess.CalledProcessError as e:
-                    print(f"Fehler bei der Installation von {lib}: {e.cmd} mit Rückgabewert {e.returncode}, Fehlerausgabe: {e.stderr}")
+                missing_libraries.append(lib)
+
+        if missing_libraries:
+            signal.signal(signal.SIGINT, _request_shutdown)
+            failed_libraries = install_packages(
+                missing_libraries,
+                retries=max(1, args.retries),
+                delay=args.delay,
+                timeout=args.timeout,
+                jobs=max(1, args.jobs),
+            )
+            if failed_libraries:
+                print(f"Folgende Bibliotheken konnten nicht installiert werden: {', '.join(failed_libraries)}")
+                for lib in failed_libraries:
+                    if lib in requirement_sources:
+                        print(f"  {lib} (aus {', '.join(requirement_sources[lib])})")
 
-        # Aktualisiere pip, falls eine neue Version verfügbar ist
-        upgrade_pip_if_needed()
\ No newline at end of file
+        # Aktualisiere pip, falls eine neue Version verfügbar ist; ohne Installationen ist die
+        # Version von pip für diesen Lauf bedeutungslos
+        if missing_libraries and not args.no_pip_upgrade and not SHUTDOWN_EVENT.is_set():
+            upgrade_pip_if_needed()
\ No newline at end of file